@@ -2,6 +2,9 @@
 Sample Utilities - Helper functions for sample format and manipulation
 """
 
+from functools import lru_cache
+
+@lru_cache(maxsize=8)
 def get_sample_format_info(bits_per_sample):
     """
     Get sample format information based on bits per sample.
@@ -2,8 +2,13 @@
 WAV I/O - Functions for reading and writing WAV files
 """
 
+import mmap
 import struct
 
+# RIFF id/size, WAVE id, fmt id/size, then the six fmt fields: audio
+# format, channels, sample rate, byte rate, block align, bits per sample
+_HEADER = struct.Struct('<4sI4s4sIHHIIHH')
+
 def read_wav(file_path, verbose=False):
     """
     Read a WAV file and parse its headers and data
@@ -23,60 +28,103 @@ def read_wav(file_path, verbose=False):
         if verbose:
             print(message)
     
-    _print_verbose(f"Reading WAV file: {file_path}")
-    
+    if verbose:
+        print(f"Reading WAV file: {file_path}")
+
+    # Memory-map the file and parse in place; the returned sample data is
+    # a zero-copy view into the mapping, so even multi-GB files cost no
+    # read() copies and pages are faulted in on demand
     with open(file_path, 'rb') as f:
-        riff = f.read(4)
-        if riff != b'RIFF':
-            raise ValueError("Not a valid WAV file: RIFF header missing")
-        
-        _ = struct.unpack('<I', f.read(4))[0]
-        
-        wave = f.read(4)
-        if wave != b'WAVE':
-            raise ValueError("Not a valid WAV file: WAVE format missing")
-        
-        fmt = f.read(4)
-        if fmt != b'fmt ':
-            raise ValueError("Not a valid WAV file: fmt subchunk missing")
-        
-        subchunk1_size = struct.unpack('<I', f.read(4))[0]
-        audio_format = struct.unpack('<H', f.read(2))[0]
-        if audio_format != 1:
-            raise ValueError("Only PCM WAV files are supported")
-        
-        num_channels = struct.unpack('<H', f.read(2))[0]
-        sample_rate = struct.unpack('<I', f.read(4))[0]
-        _ = struct.unpack('<I', f.read(4))[0]  # byte_rate
-        _ = struct.unpack('<H', f.read(2))[0]  # block_align
-        bits_per_sample = struct.unpack('<H', f.read(2))[0]
-        
-        if subchunk1_size > 16:
-            f.read(subchunk1_size - 16)
-        
-        while True:
-            chunk_id = f.read(4)
-            if not chunk_id:
-                raise ValueError("Data chunk not found in WAV file")
-            if chunk_id == b'data':
-                break
-            chunk_size = struct.unpack('<I', f.read(4))[0]
-            f.read(chunk_size)
-        
-        data_size = struct.unpack('<I', f.read(4))[0]
-        wav_data = f.read(data_size)
-        
-        _print_verbose(f"Sample rate: {sample_rate} Hz")
-        _print_verbose(f"Channels: {num_channels}")
-        _print_verbose(f"Bits per sample: {bits_per_sample}")
-        _print_verbose(f"Data size: {data_size} bytes")
-        
-        if num_channels not in (1, 2):
-            raise ValueError(f"Unsupported number of channels: {num_channels}")
-        if bits_per_sample not in (8, 16, 24, 32):
-            raise ValueError(f"Unsupported bits per sample: {bits_per_sample}")
-        
-        return sample_rate, num_channels, bits_per_sample, wav_data
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            # Empty or unmappable file; fall back to a plain read
+            data = f.read()
+
+    return read_wav_from_bytes(data, verbose)
+
+def read_wav_from_bytes(data, verbose=False):
+    """
+    Parse WAV headers and data from an in-memory buffer
+
+    Args:
+        data (bytes-like): Complete WAV file contents
+        verbose (bool): Whether to print verbose output
+
+    Returns:
+        tuple: (sample_rate, num_channels, bits_per_sample, wav_data)
+
+    Raises:
+        ValueError: If the buffer is not a valid WAV file
+    """
+
+    def _print_verbose(message):
+        if verbose:
+            print(message)
+
+    if len(data) < _HEADER.size:
+        raise ValueError("Not a valid WAV file: RIFF header missing")
+
+    (riff, _, wave, fmt, subchunk1_size, audio_format, num_channels,
+     sample_rate, _, _, bits_per_sample) = _HEADER.unpack_from(data, 0)
+
+    if riff != b'RIFF':
+        raise ValueError("Not a valid WAV file: RIFF header missing")
+
+    if wave != b'WAVE':
+        raise ValueError("Not a valid WAV file: WAVE format missing")
+
+    if fmt != b'fmt ':
+        raise ValueError("Not a valid WAV file: fmt subchunk missing")
+
+    if audio_format != 1:
+        raise ValueError("Only PCM WAV files are supported")
+
+    offset = 20 + subchunk1_size
+
+    while True:
+        chunk_id = data[offset:offset + 4]
+        if len(chunk_id) < 4:
+            raise ValueError("Data chunk not found in WAV file")
+        if chunk_id == b'data':
+            break
+        chunk_size = struct.unpack_from('<I', data, offset + 4)[0]
+        # RIFF chunks with odd sizes carry a trailing pad byte
+        offset += 8 + chunk_size + (chunk_size & 1)
+
+    data_size = struct.unpack_from('<I', data, offset + 4)[0]
+    wav_data = memoryview(data)[offset + 8:offset + 8 + data_size]
+
+    _print_verbose(f"Sample rate: {sample_rate} Hz")
+    _print_verbose(f"Channels: {num_channels}")
+    _print_verbose(f"Bits per sample: {bits_per_sample}")
+    _print_verbose(f"Data size: {data_size} bytes")
+
+    if num_channels not in (1, 2):
+        raise ValueError(f"Unsupported number of channels: {num_channels}")
+    if bits_per_sample not in (8, 16, 24, 32):
+        raise ValueError(f"Unsupported bits per sample: {bits_per_sample}")
+
+    return sample_rate, num_channels, bits_per_sample, wav_data
+
+def write_wav_header(f, sample_rate, num_channels, bits_per_sample, data_size):
+    """
+    Write the 44-byte RIFF/fmt/data chunk headers to an open binary file
+
+    Args:
+        f (file): Writable binary file object
+        sample_rate (int): Sample rate in Hz
+        num_channels (int): Number of channels (1 or 2)
+        bits_per_sample (int): Bits per sample (8, 16, 24, 32)
+        data_size (int): Size of the sample data in bytes
+    """
+
+    byte_rate = sample_rate * num_channels * bits_per_sample // 8
+    block_align = num_channels * bits_per_sample // 8
+    f.write(_HEADER.pack(b'RIFF', 36 + data_size, b'WAVE', b'fmt ', 16, 1,
+                         num_channels, sample_rate, byte_rate, block_align,
+                         bits_per_sample))
+    f.write(struct.pack('<4sI', b'data', data_size))
 
 def write_wav(output_path, sample_rate, num_channels, bits_per_sample, wav_data, verbose=False):
     """
@@ -103,26 +151,21 @@ def write_wav(output_path, sample_rate, num_channels, bits_per_sample, wav_data,
     
     if wav_data is None:
         raise ValueError("No WAV data provided")
-    
+
+    if not isinstance(wav_data, (bytes, bytearray)):
+        # Materialize mapping-backed views before opening the output:
+        # wav_data may still be the zero-copy view of the input mapping,
+        # and opening the same path for writing truncates the file those
+        # pages come from
+        wav_data = bytes(wav_data)
+
     _print_verbose(f"Writing WAV file: {output_path}")
-    
-    with open(output_path, 'wb') as f:
-        f.write(b'RIFF')
-        file_size = 36 + len(wav_data)
-        f.write(struct.pack('<I', file_size))
-        f.write(b'WAVE')
-        f.write(b'fmt ')
-        f.write(struct.pack('<I', 16))
-        f.write(struct.pack('<H', 1))  # PCM format
-        f.write(struct.pack('<H', num_channels))
-        f.write(struct.pack('<I', sample_rate))
-        byte_rate = sample_rate * num_channels * bits_per_sample // 8
-        f.write(struct.pack('<I', byte_rate))
-        block_align = num_channels * bits_per_sample // 8
-        f.write(struct.pack('<H', block_align))
-        f.write(struct.pack('<H', bits_per_sample))
-        f.write(b'data')
-        f.write(struct.pack('<I', len(wav_data)))
+
+    # A large write buffer keeps the header fields and bulk data in a
+    # handful of write() syscalls
+    with open(output_path, 'wb', buffering=1 << 20) as f:
+        write_wav_header(f, sample_rate, num_channels, bits_per_sample,
+                         len(wav_data))
         f.write(wav_data)
     
     _print_verbose("Write complete")
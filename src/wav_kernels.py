@@ -0,0 +1,86 @@
+"""
+WAV Kernels - Numba-compiled hot loops for sample processing
+
+Each kernel fuses its arithmetic and clipping into one pass over a
+contiguous sample array and mutates it in place, so a buffer crosses
+memory once per operation. Numba specializes the loops per dtype
+(int16, int32, int64) on first use. When numba is not installed the
+kernel names are None and callers fall back to the NumPy paths.
+
+cache=True persists the compiled machine code in __pycache__, so only
+the very first run of a given dtype pays compilation; every later CLI
+invocation loads the cached object. That is as close to ahead-of-time
+builds as current numba allows (the old pycc AOT compiler was removed),
+and callers additionally skip the kernels entirely for buffers too
+small to repay even the cached-load cost.
+"""
+
+try:
+    import numpy as np
+    from numba import njit, prange
+except ImportError:
+    njit = None
+    prange = range
+
+if njit is not None:
+    @njit(cache=True, fastmath=True, boundscheck=False, parallel=True, nogil=True)
+    def amplify_kernel(samples, gain, min_value, max_value):
+        for i in prange(samples.size):
+            # Clamp the float product before the int cast: a product
+            # beyond the int64 range would wrap instead of saturating
+            scaled = samples[i] * gain
+            if scaled < min_value:
+                samples[i] = min_value
+            elif scaled > max_value:
+                samples[i] = max_value
+            else:
+                samples[i] = int(scaled)
+
+    @njit(cache=True, fastmath=True, boundscheck=False, parallel=True, nogil=True)
+    def soft_clip_kernel(samples, threshold, min_value, max_value):
+        thresh_val = max_value * threshold
+        inv_denom = 1.0 / (3 * thresh_val * thresh_val)
+        for i in prange(samples.size):
+            # Widen before abs(): abs of the most negative native value
+            # would overflow in the storage dtype
+            value = np.int64(samples[i])
+            abs_sample = abs(value)
+            if abs_sample > thresh_val:
+                sign = 1 if value > 0 else -1
+                excess = abs_sample - thresh_val
+                clipped = thresh_val + (excess - (excess ** 3) * inv_denom)
+                value = int(sign * min(max_value, max(thresh_val, clipped)))
+                if value < min_value:
+                    value = min_value
+                elif value > max_value:
+                    value = max_value
+                samples[i] = value
+
+    @njit(cache=True, fastmath=True, boundscheck=False, parallel=True, nogil=True)
+    def amplify_soft_clip_kernel(samples, gain, threshold, min_value, max_value):
+        thresh_val = max_value * threshold
+        inv_denom = 1.0 / (3 * thresh_val * thresh_val)
+        for i in prange(samples.size):
+            # Same float-space clamp as amplify_kernel before the cast
+            scaled = samples[i] * gain
+            if scaled < min_value:
+                value = min_value
+            elif scaled > max_value:
+                value = max_value
+            else:
+                value = int(scaled)
+            abs_sample = abs(value)
+            if abs_sample > thresh_val:
+                sign = 1 if value > 0 else -1
+                excess = abs_sample - thresh_val
+                clipped = thresh_val + (excess - (excess ** 3) * inv_denom)
+                value = int(sign * min(max_value, max(thresh_val, clipped)))
+                if value < min_value:
+                    value = min_value
+                elif value > max_value:
+                    value = max_value
+            samples[i] = value
+else:
+    amplify_kernel = None
+    soft_clip_kernel = None
+    amplify_soft_clip_kernel = None
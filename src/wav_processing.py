@@ -2,117 +2,517 @@
 WAV Processing - Core audio processing functions
 """
 
-import struct
+import array
+from functools import lru_cache
 from sample_utils import get_sample_format_info
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from wav_kernels import amplify_kernel, soft_clip_kernel, amplify_soft_clip_kernel
+
+if np is not None:
+    # NumPy dtypes matching the packed sample layout for each supported width
+    _SAMPLE_DTYPES = {8: np.uint8, 16: np.int16, 32: np.int32}
+
+# Tile size for the blocked NumPy passes: 16 Ki int64 samples keep the
+# multiply + clip working set cache-resident between the two ufunc calls
+_BLOCK_SAMPLES = 16384
+
+# Below this sample count the one-off JIT compilation (even a cached
+# load) costs more than the NumPy pass it replaces, so short CLI runs
+# never pay Numba warm-up
+_NUMBA_MIN_SAMPLES = 1 << 16
+
 def _apply_gain(sample_value, gain, min_value, max_value):
     """Apply gain to a sample and clip to bounds."""
-    
+
     sample_value = int(sample_value * gain)
-    return max(min_value, min(max_value, sample_value))
+    if sample_value < min_value:
+        return min_value
+    if sample_value > max_value:
+        return max_value
+    return sample_value
 
 def _apply_anti_distortion(sample_value, threshold, max_value):
     """Apply anti-distortion to a sample using soft clipping."""
-    
+
     abs_sample = abs(sample_value)
     thresh_val = max_value * threshold
-    
+
     if abs_sample > thresh_val:
         sign = 1 if sample_value > 0 else -1
         excess = abs_sample - thresh_val
         clipped = thresh_val + (excess - (excess**3) / (3 * thresh_val**2))
         sample_value = int(sign * min(max_value, max(thresh_val, clipped)))
         return max(-max_value - 1, min(max_value, sample_value))
-    
+
     return sample_value
 
+@lru_cache(maxsize=8)
+def _clip_bounds(bits_per_sample):
+    """Signed clip bounds for the (centered) sample range of a width."""
+
+    hi = (1 << (bits_per_sample - 1)) - 1
+    return -hi - 1, hi
+
+@lru_cache(maxsize=8)
+def _byte_translate_table(gain, threshold):
+    """
+    Build the 256-entry translation table for 8-bit processing.
+
+    Every unsigned byte maps to exactly one output byte for a fixed gain
+    or threshold, so the whole pass collapses to bytes.translate — a
+    single C loop with no unpacking at all.
+    """
+
+    if gain is not None:
+        return bytes(_apply_gain(value - 128, gain, -128, 127) + 128
+                     for value in range(256))
+    return bytes(_apply_anti_distortion(value - 128, threshold, 127) + 128
+                 for value in range(256))
+
+@lru_cache(maxsize=8)
+def _gain_lut_16(gain):
+    """
+    Build a 65536-entry int16 lookup table for 16-bit amplification.
+
+    Indexed by the raw uint16 bit pattern of a sample; the 128 KB table
+    stays L2-resident and turns the multiply + clip pass into a single
+    gather.
+    """
+
+    signed = np.arange(65536, dtype=np.int64)
+    signed[signed >= 32768] -= 65536
+    # Clamp while still in float: casting a product beyond the int64
+    # range first would wrap instead of saturating
+    return np.clip(signed * gain, -32768, 32767).astype(np.int16)
+
+@lru_cache(maxsize=8)
+def _clip_lut_16(threshold):
+    """
+    Build a 65536-entry int16 lookup table for 16-bit anti-distortion.
+
+    The counterpart of _gain_lut_16: indexed by the raw uint16 bit
+    pattern, with the cubic soft clip baked in per threshold, so the
+    whole pass is a single gather with no sign or magnitude math.
+    """
+
+    signed = np.arange(65536, dtype=np.int64)
+    signed[signed >= 32768] -= 65536
+    magnitude_lut = _soft_clip_lut(threshold, 32767)
+    return (np.sign(signed) * magnitude_lut[np.abs(signed)]).astype(np.int16)
+
+@lru_cache(maxsize=8)
+def _soft_clip_lut(threshold, max_value):
+    """
+    Build a lookup table mapping absolute sample magnitude to its
+    soft-clipped value for the given threshold and (centered) max value.
+
+    The cubic is a pure function of the magnitude, so for 8- and 16-bit
+    audio a table of max_value + 2 entries (magnitudes can reach
+    max_value + 1 for the most negative sample) replaces the per-sample
+    polynomial with a single gather.
+    """
+
+    thresh_val = max_value * threshold
+    magnitudes = np.arange(max_value + 2, dtype=np.float64)
+    excess = magnitudes - thresh_val
+    clipped = thresh_val + (excess - excess ** 3 / (3 * thresh_val ** 2))
+    soft = np.minimum(max_value, np.maximum(thresh_val, clipped)).astype(np.int64)
+    return np.where(magnitudes > thresh_val, soft, magnitudes.astype(np.int64))
+
+def _amplify_samples(samples, gain, min_value, max_value):
+    """Apply gain to an int64 sample array and clip to bounds."""
+
+    if amplify_kernel is not None and samples.size >= _NUMBA_MIN_SAMPLES:
+        amplify_kernel(samples, gain, min_value, max_value)
+        return samples
+
+    # Multiply and clip one cache-sized tile at a time so each block
+    # stays resident between the ufunc passes. The clip happens on the
+    # float product — saturating before the cast, since a product beyond
+    # the int64 range would wrap — and the unsafe copyto truncates
+    # toward zero exactly like int() in the scalar path
+    for start in range(0, samples.size, _BLOCK_SAMPLES):
+        block = samples[start:start + _BLOCK_SAMPLES]
+        scaled = block * gain
+        np.clip(scaled, min_value, max_value, out=scaled)
+        np.copyto(block, scaled, casting='unsafe')
+    return samples
+
+def _anti_distort_samples(samples, threshold, max_value):
+    """Apply anti-distortion to an int64 sample array using soft clipping."""
+
+    if soft_clip_kernel is not None and samples.size >= _NUMBA_MIN_SAMPLES:
+        soft_clip_kernel(samples, threshold, -max_value - 1, max_value)
+        return samples
+
+    thresh_val = max_value * threshold
+    abs_samples = np.abs(samples)
+    mask = abs_samples > thresh_val
+    if not mask.any():
+        return samples
+
+    # Gather only the over-threshold samples and run the cubic on that
+    # (usually small) subset with in-place ufuncs; below-threshold
+    # samples are never touched
+    excess = abs_samples[mask].astype(np.float64)
+    np.subtract(excess, thresh_val, out=excess)
+    cubic = excess * excess
+    np.multiply(cubic, excess, out=cubic)
+    cubic *= 1.0 / (3 * thresh_val * thresh_val)
+    np.subtract(excess, cubic, out=excess)
+    excess += thresh_val
+    np.clip(excess, thresh_val, max_value, out=excess)
+
+    soft = excess.astype(np.int64)
+    samples[mask] = np.where(samples[mask] > 0, soft, -soft)
+    return samples
+
 def process_standard_samples(wav_data, bits_per_sample, gain=None, threshold=None):
     """
     Process 8, 16, or 32-bit samples with gain or anti-distortion.
-    
+
     Args:
         wav_data (bytes): Raw audio data
         bits_per_sample (int): Bits per sample
         gain (float, optional): Gain factor for amplification
         threshold (float, optional): Threshold for anti-distortion
-        
+
     Returns:
         bytes: Processed audio data
-        
+
     Raises:
         ValueError: If both gain and threshold are provided or neither
     """
-    
+
     if (gain is None and threshold is None) or (gain is not None and threshold is not None):
         raise ValueError("Exactly one of gain or threshold must be provided")
-    
+
+    # Unity gain is a no-op and zero gain is silence; skip the pass entirely
+    if gain == 1.0:
+        return wav_data
+    if gain == 0.0:
+        return b'\x80' * len(wav_data) if bits_per_sample == 8 else bytes(len(wav_data))
+
+    if bits_per_sample == 8:
+        table = _byte_translate_table(gain, threshold)
+        if not isinstance(wav_data, (bytes, bytearray)):
+            wav_data = bytes(wav_data)
+        return wav_data.translate(table)
+
     sample_format, max_value, zero_value = get_sample_format_info(bits_per_sample)
-    sample_size = bits_per_sample // 8
-    sample_count = len(wav_data) // sample_size
-    
-    format_str = '<' + sample_format * sample_count
-    samples = list(struct.unpack(format_str, wav_data))
-    
-    min_value = -max_value - 1 if zero_value == 0 else -zero_value
-    is_8bit = bits_per_sample == 8
-    
-    for i in range(sample_count):
-        sample_value = samples[i] - zero_value if is_8bit else samples[i]
-        
+
+    if np is None:
+        return _process_standard_fallback(wav_data, sample_format, max_value,
+                                          zero_value, gain, threshold)
+
+    samples = np.frombuffer(wav_data, dtype=_SAMPLE_DTYPES[bits_per_sample])
+    return process_standard_array(samples, bits_per_sample,
+                                  gain=gain, threshold=threshold).tobytes()
+
+def unpack_24bit(wav_data):
+    """
+    Expand packed little-endian 24-bit samples to an int32 array.
+
+    Pads each 3-byte sample to 4 bytes, reinterprets as int32, and
+    sign-extends with a shift pair — one vector pass, no Python loop.
+    """
+
+    raw = np.frombuffer(wav_data, dtype=np.uint8)
+    sample_count = raw.size // 3
+    padded = np.zeros((sample_count, 4), dtype=np.uint8)
+    padded[:, :3] = raw[:sample_count * 3].reshape(-1, 3)
+    return (padded.view(np.int32).reshape(-1) << 8) >> 8
+
+def pack_24bit(samples):
+    """Pack an integer sample array back into little-endian 24-bit bytes."""
+
+    packed = np.empty((samples.size, 3), dtype=np.uint8)
+    packed[:, 0] = samples & 0xFF
+    packed[:, 1] = (samples >> 8) & 0xFF
+    packed[:, 2] = (samples >> 16) & 0xFF
+    return packed.tobytes()
+
+def sample_dtype(bits_per_sample):
+    """
+    Return the NumPy dtype matching the packed sample layout, or None
+    when NumPy is unavailable or the samples have no native dtype (24-bit).
+    """
+
+    if np is None:
+        return None
+    return _SAMPLE_DTYPES.get(bits_per_sample)
+
+def process_standard_array(samples, bits_per_sample, gain=None, threshold=None):
+    """
+    Process a 1-D NumPy array of 8, 16, or 32-bit samples with gain or
+    anti-distortion.
+
+    Args:
+        samples (np.ndarray): Samples in their native dtype
+        bits_per_sample (int): Bits per sample
+        gain (float, optional): Gain factor for amplification
+        threshold (float, optional): Threshold for anti-distortion
+
+    Returns:
+        np.ndarray: Processed samples, same dtype as the input
+
+    Raises:
+        ValueError: If both gain and threshold are provided or neither
+    """
+
+    if (gain is None and threshold is None) or (gain is not None and threshold is not None):
+        raise ValueError("Exactly one of gain or threshold must be provided")
+
+    if gain == 1.0:
+        return samples
+    if gain == 0.0:
+        return np.full_like(samples, 128 if bits_per_sample == 8 else 0)
+
+    if bits_per_sample == 8:
+        table = np.frombuffer(_byte_translate_table(gain, threshold), dtype=np.uint8)
+        return table[samples]
+
+    if bits_per_sample == 16 and gain is not None:
+        return _gain_lut_16(gain)[samples.view(np.uint16)]
+
+    if bits_per_sample == 16 and threshold is not None and threshold > 0.0:
+        return _clip_lut_16(threshold)[samples.view(np.uint16)]
+
+    # Integer bounds are fixed per width; compute them once here and hand
+    # plain ints to the kernels so no per-sample conversion survives
+    min_value, max_value = _clip_bounds(bits_per_sample)
+
+    if amplify_kernel is not None and samples.size >= _NUMBA_MIN_SAMPLES:
+        # Fused single-pass kernel on the native dtype: one trip through
+        # memory and no widened int64 copy
+        work = samples.copy()
         if gain is not None:
-            sample_value = _apply_gain(sample_value, gain, min_value, max_value)
-        else:  # threshold is not None
-            sample_value = _apply_anti_distortion(sample_value, threshold, max_value)
-        
-        samples[i] = sample_value + zero_value if is_8bit else sample_value
-    
-    return struct.pack(format_str, *samples)
+            amplify_kernel(work, gain, min_value, max_value)
+        else:
+            soft_clip_kernel(work, threshold, min_value, max_value)
+        return work
+
+    work = samples.astype(np.int64)
+
+    if gain is not None:
+        work = _amplify_samples(work, gain, min_value, max_value)
+    else:
+        work = _anti_distort_samples(work, threshold, max_value)
+
+    return work.astype(samples.dtype)
+
+def process_ops_array(samples, bits_per_sample, ops):
+    """
+    Apply a sequence of queued edits to a 1-D NumPy sample array.
+
+    Args:
+        samples (np.ndarray): Samples in their native dtype
+        bits_per_sample (int): Bits per sample
+        ops (list): ("amplify", gain) / ("anti_distortion", threshold) pairs
+
+    Returns:
+        np.ndarray: Processed samples, same dtype as the input
+
+    An amplify immediately followed by an anti-distortion is fused into
+    a single kernel pass where the JIT kernels are in play, halving the
+    memory traffic for the common amplify-then-limit chain. A writable
+    input (or the buffer produced by the first edit) is reused across
+    the whole chain — each kernel op mutates it in place, so a long
+    chain allocates at most one working copy.
+    """
+
+    # A read-only input (the mmap view of the source file) is copied by
+    # the first mutating op; from then on the chain owns the buffer
+    owned = samples.flags.writeable
+
+    index = 0
+    while index < len(ops):
+        name, value = ops[index]
+
+        kernel_ready = (bits_per_sample != 8
+                        and amplify_soft_clip_kernel is not None
+                        and samples.size >= _NUMBA_MIN_SAMPLES)
+
+        if (name == "amplify" and index + 1 < len(ops)
+                and ops[index + 1][0] == "anti_distortion"
+                and kernel_ready
+                and value != 0.0 and ops[index + 1][1] > 0.0):
+            min_value, max_value = _clip_bounds(bits_per_sample)
+            work = samples if owned else samples.copy()
+            amplify_soft_clip_kernel(work, value, ops[index + 1][1],
+                                     min_value, max_value)
+            samples, owned = work, True
+            index += 2
+            continue
+
+        if kernel_ready and ((name == "amplify" and value not in (0.0, 1.0))
+                             or (name == "anti_distortion" and value > 0.0)):
+            min_value, max_value = _clip_bounds(bits_per_sample)
+            work = samples if owned else samples.copy()
+            if name == "amplify":
+                amplify_kernel(work, value, min_value, max_value)
+            else:
+                soft_clip_kernel(work, value, min_value, max_value)
+            samples, owned = work, True
+            index += 1
+            continue
+
+        if name == "amplify":
+            samples = process_standard_array(samples, bits_per_sample, gain=value)
+        else:
+            samples = process_standard_array(samples, bits_per_sample, threshold=value)
+        owned = samples.flags.writeable
+        index += 1
+
+    return samples
+
+def _process_standard_fallback(wav_data, sample_format, max_value, zero_value,
+                               gain, threshold):
+    """Pure-Python processing path used when NumPy is unavailable."""
+
+    # array.array unpacks in a single C memcpy and supports in-place
+    # mutation, avoiding a boxed list of millions of ints
+    samples = array.array(sample_format)
+    samples.frombytes(wav_data)
+
+    max_value -= zero_value
+    min_value = -max_value - 1
+
+    # Bind loop invariants to locals and specialize the unsigned (8-bit)
+    # and signed loop bodies; local lookups are markedly cheaper than
+    # globals in the per-sample hot loop
+    sample_count = len(samples)
+    zero = zero_value
+    mn, mx = min_value, max_value
+    _int = int
+
+    if gain is not None:
+        g = gain
+        if zero:
+            for i in range(sample_count):
+                value = _int((samples[i] - zero) * g)
+                if value < mn:
+                    value = mn
+                elif value > mx:
+                    value = mx
+                samples[i] = value + zero
+        else:
+            for i in range(sample_count):
+                value = _int(samples[i] * g)
+                if value < mn:
+                    value = mn
+                elif value > mx:
+                    value = mx
+                samples[i] = value
+    else:  # threshold is not None
+        thresh_val = max_value * threshold
+        denom = 3 * thresh_val ** 2
+        for i in range(sample_count):
+            value = samples[i] - zero
+            abs_sample = abs(value)
+            if abs_sample > thresh_val:
+                sign = 1 if value > 0 else -1
+                excess = abs_sample - thresh_val
+                clipped = thresh_val + (excess - excess ** 3 / denom)
+                value = _int(sign * min(mx, max(thresh_val, clipped)))
+                if value < mn:
+                    value = mn
+                elif value > mx:
+                    value = mx
+                samples[i] = value + zero
+
+    return samples.tobytes()
 
 def process_24bit_samples(wav_data, gain=None, threshold=None):
     """
     Process 24-bit samples with gain or anti-distortion.
-    
+
     Args:
         wav_data (bytes): Raw audio data
         gain (float, optional): Gain factor for amplification
         threshold (float, optional): Threshold for anti-distortion
-        
+
     Returns:
         bytes: Processed audio data
     """
-    
-    _, max_value, _ = get_sample_format_info(24)
-    sample_size = 3
-    sample_count = len(wav_data) // sample_size
+
+    if gain == 1.0:
+        return wav_data
+    if gain == 0.0:
+        return bytes(len(wav_data))
+
+    if np is None:
+        _, max_value, _ = get_sample_format_info(24)
+        return _process_24bit_fallback(wav_data, max_value, gain, threshold)
+
+    # Delegate to the shared array path so 24-bit audio gets exactly the
+    # same clip bounds and soft-clip knee as every other width
+    samples = process_standard_array(unpack_24bit(wav_data), 24,
+                                     gain=gain, threshold=threshold)
+    return pack_24bit(samples)
+
+def _process_24bit_fallback(wav_data, max_value, gain, threshold):
+    """Pure-Python 24-bit processing path used when NumPy is unavailable."""
+
     new_data = bytearray(len(wav_data))
-    
-    for i in range(sample_count):
-        byte_pos = i * sample_size
-        b1 = wav_data[byte_pos]
-        b2 = wav_data[byte_pos + 1]
-        b3 = wav_data[byte_pos + 2]
-        
-        sample_value = b1 | (b2 << 8) | (b3 << 16)
-        
-        if sample_value & 0x800000:
-            sample_value = sample_value - 0x1000000
-        
-        if gain is not None:
-            sample_value = int(sample_value * gain)
-            sample_value = max(-max_value, min(max_value, sample_value))
-        elif threshold is not None:
+    sample_count = len(wav_data) // 3
+
+    # Hoist loop invariants to locals and split the gain and threshold
+    # bodies, same shape as the standard-width fallback: local lookups
+    # and branch-free inner bodies keep the per-sample cost down
+    mn, mx = -max_value - 1, max_value
+    _int = int
+
+    if gain is not None:
+        g = gain
+        for byte_pos in range(0, sample_count * 3, 3):
+            sample_value = (wav_data[byte_pos]
+                            | (wav_data[byte_pos + 1] << 8)
+                            | (wav_data[byte_pos + 2] << 16))
+            if sample_value & 0x800000:
+                sample_value -= 0x1000000
+
+            sample_value = _int(sample_value * g)
+            if sample_value < mn:
+                sample_value = mn
+            elif sample_value > mx:
+                sample_value = mx
+
+            if sample_value < 0:
+                sample_value += 0x1000000
+            new_data[byte_pos] = sample_value & 0xFF
+            new_data[byte_pos + 1] = (sample_value >> 8) & 0xFF
+            new_data[byte_pos + 2] = (sample_value >> 16) & 0xFF
+    else:  # threshold is not None
+        thresh_val = max_value * threshold
+        denom = 3 * thresh_val ** 2
+        for byte_pos in range(0, sample_count * 3, 3):
+            sample_value = (wav_data[byte_pos]
+                            | (wav_data[byte_pos + 1] << 8)
+                            | (wav_data[byte_pos + 2] << 16))
+            if sample_value & 0x800000:
+                sample_value -= 0x1000000
+
             abs_sample = abs(sample_value)
-            thresh_val = max_value * threshold
             if abs_sample > thresh_val:
                 sign = 1 if sample_value > 0 else -1
                 excess = abs_sample - thresh_val
-                clipped = thresh_val + (excess - (excess**3) / (3 * thresh_val**2))
-                sample_value = int(sign * min(max_value, clipped))
-        
-        if sample_value < 0:
-            sample_value = sample_value + 0x1000000
-        new_data[byte_pos] = sample_value & 0xFF
-        new_data[byte_pos + 1] = (sample_value >> 8) & 0xFF
-        new_data[byte_pos + 2] = (sample_value >> 16) & 0xFF
-    
-    return bytes(new_data)
\ No newline at end of file
+                clipped = thresh_val + (excess - excess ** 3 / denom)
+                sample_value = _int(sign * min(mx, max(thresh_val, clipped)))
+                if sample_value < mn:
+                    sample_value = mn
+                elif sample_value > mx:
+                    sample_value = mx
+
+            if sample_value < 0:
+                sample_value += 0x1000000
+            new_data[byte_pos] = sample_value & 0xFF
+            new_data[byte_pos + 1] = (sample_value >> 8) & 0xFF
+            new_data[byte_pos + 2] = (sample_value >> 16) & 0xFF
+
+    return bytes(new_data)
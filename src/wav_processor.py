@@ -2,8 +2,17 @@
 WAV Processor - Main class for WAV audio processing
 """
 
-from wav_io import read_wav, write_wav
-from wav_processing import process_standard_samples, process_24bit_samples
+from functools import partial
+
+from wav_io import read_wav, write_wav, write_wav_header
+from wav_processing import (process_standard_samples, process_24bit_samples,
+                            process_ops_array, sample_dtype,
+                            unpack_24bit, pack_24bit)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 class WAVProcessor:
     """
@@ -24,7 +33,10 @@ class WAVProcessor:
         self.sample_rate = None
         self.num_channels = None
         self.bits_per_sample = None
-    
+        self._pending = []
+        self._dtype = None
+        self._proc = None
+
     def _print_verbose(self, message):
         """Print a message if verbose mode is enabled"""
         
@@ -34,20 +46,51 @@ class WAVProcessor:
     def read_wav(self, file_path):
         """
         Read a WAV file and store its parameters and data
-        
+
+        With NumPy available, the sample data is kept as a typed ndarray
+        viewing the file mapping, so editing operations run on a native
+        integer array instead of opaque bytes. Stereo stays in its
+        interleaved file order as one flat 1-D buffer — per-sample edits
+        are channel-independent, so a single stride-1 pass beats
+        splitting into per-channel arrays.
+
         Args:
             file_path (str): Path to the WAV file
         """
-        
+
         self.sample_rate, self.num_channels, self.bits_per_sample, self.wav_data = read_wav(file_path, self.verbose)
+        self._pending = []
+
+        dtype = sample_dtype(self.bits_per_sample)
+        if dtype is not None:
+            self.wav_data = np.frombuffer(self.wav_data, dtype=dtype)
+        elif np is not None and self.bits_per_sample == 24:
+            # Expand packed 24-bit samples to int32 once; all editing then
+            # shares the standard array path and write_wav repacks
+            self.wav_data = unpack_24bit(self.wav_data)
+
+        # Cache the working dtype so later dispatch never re-inspects
+        # bits_per_sample; None means the bytes fallback mode
+        self._dtype = self.wav_data.dtype if np is not None else None
+
+        # Bind the bytes-mode processing function for this format once,
+        # so flush never re-branches on bits_per_sample per edit
+        if self.bits_per_sample == 24:
+            self._proc = process_24bit_samples
+        else:
+            self._proc = partial(process_standard_samples,
+                                 bits_per_sample=self.bits_per_sample)
     
     def amplify(self, gain):
         """
         Amplify the audio by the specified gain factor
-        
+
+        The edit is queued and applied on the next flush/write, so
+        chained edits share a single pass over the sample data.
+
         Args:
             gain (float): The gain factor to apply
-            
+
         Raises:
             ValueError: If gain is negative or no WAV data loaded
         """
@@ -58,22 +101,43 @@ class WAVProcessor:
         if self.wav_data is None:
             raise ValueError("No WAV data loaded. Call read_wav first.")
         
-        self._print_verbose(f"Amplifying audio with gain factor: {gain}")
-        
-        if self.bits_per_sample == 24:
-            self.wav_data = process_24bit_samples(self.wav_data, gain=gain)
-        else:
-            self.wav_data = process_standard_samples(self.wav_data, self.bits_per_sample, gain=gain)
-        
-        self._print_verbose("Amplification complete")
+        if gain == 1.0:
+            # Unity gain cannot change a sample; never queue the pass
+            self._print_verbose("Skipping amplification: unity gain")
+            return
+
+        if gain == 0.0:
+            # Zero gain silences everything, so whatever was queued
+            # before it can no longer affect the output
+            self._print_verbose("Zero gain: dropping previously queued edits")
+            self._pending = [("amplify", 0.0)]
+            return
+
+        if self._pending and self._pending[-1][0] == "amplify":
+            # Consecutive gains compose multiplicatively; fold them into
+            # one pass so the buffer is walked — and quantized — once
+            gain *= self._pending.pop()[1]
+            if gain == 1.0:
+                self._print_verbose("Folded gains cancel out: nothing queued")
+                return
+            if gain == 0.0:
+                self._pending = [("amplify", 0.0)]
+                return
+
+        self._print_verbose(f"Queueing amplification with gain factor: {gain}")
+
+        self._pending.append(("amplify", gain))
     
     def anti_distortion(self, threshold):
         """
         Apply anti-distortion to the audio by soft clipping above a threshold
-        
+
+        The edit is queued and applied on the next flush/write, so
+        chained edits share a single pass over the sample data.
+
         Args:
             threshold (float): Normalized threshold (0.0-1.0) for clipping
-            
+
         Raises:
             ValueError: If threshold is not between 0.0 and 1.0 or no WAV data loaded
         """
@@ -84,15 +148,63 @@ class WAVProcessor:
         if self.wav_data is None:
             raise ValueError("No WAV data loaded. Call read_wav first.")
         
-        self._print_verbose(f"Applying anti-distortion with threshold: {threshold}")
-        
-        if self.bits_per_sample == 24:
-            self.wav_data = process_24bit_samples(self.wav_data, threshold=threshold)
-        else:
-            self.wav_data = process_standard_samples(self.wav_data, self.bits_per_sample, threshold=threshold)
-        
-        self._print_verbose("Anti-distortion complete")
+        if threshold >= 1.0:
+            # A full-range threshold leaves every representable sample
+            # below the knee; treat it as a no-op
+            self._print_verbose("Skipping anti-distortion: full-range threshold")
+            return
+
+        self._print_verbose(f"Queueing anti-distortion with threshold: {threshold}")
+
+        self._pending.append(("anti_distortion", threshold))
     
+    def apply(self, ops):
+        """
+        Queue a batch of edits and apply them in one pass
+
+        Equivalent to calling amplify/anti_distortion for each entry and
+        then flush(), but dispatches into the processing layer once, so
+        adjacent edits can be fused into a single pass over the samples.
+
+        Args:
+            ops (list): ("amplify", gain) / ("anti_distortion", threshold) pairs
+
+        Raises:
+            ValueError: If an op name or argument is invalid or no WAV data loaded
+        """
+
+        for name, value in ops:
+            if name == "amplify":
+                self.amplify(value)
+            elif name == "anti_distortion":
+                self.anti_distortion(value)
+            else:
+                raise ValueError(f"Unknown operation: {name}")
+
+        self.flush()
+
+    def flush(self):
+        """
+        Apply any queued edits to the sample data
+
+        Called automatically by write_wav; only needed explicitly when
+        inspecting wav_data between edits.
+        """
+
+        if not self._pending:
+            return
+
+        ops, self._pending = self._pending, []
+        self._print_verbose(f"Applying {len(ops)} queued edit(s)")
+
+        if self._dtype is not None:
+            self.wav_data = process_ops_array(self.wav_data, self.bits_per_sample, ops)
+            return
+
+        for name, value in ops:
+            kwargs = {"gain": value} if name == "amplify" else {"threshold": value}
+            self.wav_data = self._proc(self.wav_data, **kwargs)
+
     def write_wav(self, output_path):
         """
         Write the processed audio data to a new WAV file
@@ -100,5 +212,26 @@ class WAVProcessor:
         Args:
             output_path (str): Path to write the WAV file
         """
-       
-        return write_wav(output_path, self.sample_rate, self.num_channels, self.bits_per_sample, self.wav_data, self.verbose)
\ No newline at end of file
+
+        self.flush()
+
+        wav_data = self.wav_data
+        if self._dtype is not None:
+            if self.bits_per_sample != 24:
+                if not wav_data.flags.writeable:
+                    # An unedited array still aliases the read mapping;
+                    # copy it before the output open can truncate the
+                    # same file out from under those pages
+                    wav_data = wav_data.copy()
+                # Stream the typed array straight to disk: header helper
+                # plus one tofile call, no serialization copy in between
+                self._print_verbose(f"Writing WAV file: {output_path}")
+                with open(output_path, 'wb', buffering=1 << 20) as f:
+                    write_wav_header(f, self.sample_rate, self.num_channels,
+                                     self.bits_per_sample, wav_data.nbytes)
+                    wav_data.tofile(f)
+                self._print_verbose("Write complete")
+                return output_path
+            wav_data = pack_24bit(wav_data)
+
+        return write_wav(output_path, self.sample_rate, self.num_channels, self.bits_per_sample, wav_data, self.verbose)
\ No newline at end of file